@@ -2,7 +2,7 @@ import datetime
 from typing import Union
 from django.conf import settings
 import structlog
-from celery import chain
+from celery import chain, group
 from prometheus_client import Histogram
 
 from posthog.models.dashboard_tile import get_tiles_ordered_by_position
@@ -11,6 +11,7 @@ from posthog.models.insight import Insight
 from posthog.models.sharing_configuration import SharingConfiguration
 from posthog.models.subscription import Subscription
 from posthog.tasks import exporter
+from posthog.tasks.exports.exporter_utils import get_render_durations
 from posthog.utils import wait_for_parallel_celery_group
 
 logger = structlog.get_logger(__name__)
@@ -54,12 +55,20 @@ def generate_assets(
             return insights, assets
 
         # Wait for all assets to be exported
-        tasks = [exporter.export_asset.si(asset.id) for asset in assets]
-        # run them one after the other, so we don't exhaust celery workers
         exports_expire = datetime.datetime.now(tz=datetime.UTC) + datetime.timedelta(
             minutes=settings.PARALLEL_ASSET_GENERATION_MAX_TIMEOUT_MINUTES
         )
-        parallel_job = chain(*tasks).apply_async(expires=exports_expire, retry=False)
+        if settings.IMAGE_EXPORT_PARALLEL_TILES:
+            # Longest processing time first: queue the slowest renders (as of their last export) first
+            # so that they don't end up as the long tail once the faster ones are done
+            durations = get_render_durations([asset.insight_id for asset in assets if asset.insight_id])
+            ordered_assets = sorted(assets, key=lambda asset: durations.get(asset.insight_id, 0), reverse=True)
+            tasks = [exporter.export_asset.si(asset.id) for asset in ordered_assets]
+            parallel_job = group(*tasks).apply_async(expires=exports_expire, retry=False)
+        else:
+            tasks = [exporter.export_asset.si(asset.id) for asset in assets]
+            # run them one after the other, so we don't exhaust celery workers
+            parallel_job = chain(*tasks).apply_async(expires=exports_expire, retry=False)
 
         wait_for_parallel_celery_group(
             parallel_job,
@@ -50,6 +50,29 @@ class TestSubscriptionsTasksUtils(APIBaseTest):
         assert len(assets) == DEFAULT_MAX_ASSET_COUNT
         assert mock_export_task.si.call_count == DEFAULT_MAX_ASSET_COUNT
 
+    @patch("ee.tasks.subscriptions.subscription_utils.group")
+    @patch("ee.tasks.subscriptions.subscription_utils.get_render_durations")
+    def test_generate_assets_in_parallel_slowest_first(
+        self,
+        mock_get_render_durations: MagicMock,
+        mock_group: MagicMock,
+        mock_export_task: MagicMock,
+        mock_chain: MagicMock,
+    ) -> None:
+        slowest_insight = self.tiles[3].insight
+        assert slowest_insight is not None
+        mock_get_render_durations.return_value = {slowest_insight.id: 12.5}
+        subscription = create_subscription(team=self.team, dashboard=self.dashboard, created_by=self.user)
+
+        with self.settings(PARALLEL_ASSET_GENERATION_MAX_TIMEOUT_MINUTES=1, IMAGE_EXPORT_PARALLEL_TILES=True):
+            insights, assets = generate_assets(subscription)
+
+        assert mock_group.call_count == 1
+        mock_chain.assert_not_called()
+        slowest_asset = next(asset for asset in assets if asset.insight_id == slowest_insight.id)
+        assert mock_export_task.si.call_args_list[0].args == (slowest_asset.id,)
+        assert mock_export_task.si.call_count == DEFAULT_MAX_ASSET_COUNT
+
     def test_raises_if_missing_resource(self, _mock_export_task: MagicMock, _mock_group: MagicMock) -> None:
         subscription = create_subscription(team=self.team, created_by=self.user)
 
@@ -75,7 +75,8 @@ export function DashboardHeader(): JSX.Element | null {
 
     const exportOptions: ExportButtonItem[] = [
         {
-            export_format: ExporterFormat.PNG,
+            // Dashboards are big, and JPEG keeps them a fraction of the size of a PNG while looking the same
+            export_format: ExporterFormat.JPEG,
             dashboard: dashboard?.id,
             export_context: {
                 path: apiUrl(),
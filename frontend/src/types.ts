@@ -3813,6 +3813,7 @@ export interface SharingConfigurationType {
 
 export enum ExporterFormat {
     PNG = 'image/png',
+    JPEG = 'image/jpeg',
     CSV = 'text/csv',
     PDF = 'application/pdf',
     JSON = 'application/json',
@@ -3851,6 +3852,7 @@ export interface ExportedAssetType {
     filename: string
     created_at: string
     expires_after?: string
+    force_refresh?: boolean
 }
 
 export enum FeatureFlagReleaseType {
@@ -37,6 +37,7 @@ class ExportedAssetSerializer(serializers.ModelSerializer):
             "export_context",
             "filename",
             "expires_after",
+            "force_refresh",
         ]
         read_only_fields = ["id", "created_at", "has_content", "filename"]
 
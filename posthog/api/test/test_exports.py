@@ -91,6 +91,7 @@ class TestExports(APIBaseTest):
             "has_content": False,
             "insight": None,
             "export_context": None,
+            "force_refresh": False,
             # without an expiry being set at creation, the default is 6 months
             "expires_after": (now() + timedelta(weeks=26))
             .replace(hour=0, minute=0, second=0, microsecond=0)
@@ -122,11 +123,25 @@ class TestExports(APIBaseTest):
             "has_content": False,
             "insight": None,
             "export_context": None,
+            "force_refresh": False,
             "expires_after": one_week_from_now.isoformat() + "Z",
         }
 
         mock_exporter_task.export_asset.delay.assert_called_once_with(data["id"])
 
+    @patch("posthog.api.exports.exporter")
+    def test_can_create_export_with_force_refresh(self, mock_exporter_task) -> None:
+        response = self.client.post(
+            f"/api/projects/{self.team.id}/exports",
+            {"export_format": "image/png", "insight": self.insight.id, "force_refresh": True},
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        data = response.json()
+        assert data["force_refresh"] is True
+        assert ExportedAsset.objects.get(pk=data["id"]).force_refresh is True
+
+        mock_exporter_task.export_asset.delay.assert_called_once_with(data["id"])
+
     @patch("posthog.api.exports.exporter")
     def test_swallow_missing_schema_and_allow_front_end_to_poll(self, mock_exporter_task) -> None:
         # regression test see https://github.com/PostHog/posthog/issues/11204
@@ -150,10 +165,10 @@ class TestExports(APIBaseTest):
         data = response.json()
         mock_exporter_task.export_asset.delay.assert_called_once_with(data["id"])
 
-    @patch("posthog.tasks.exports.image_exporter._export_to_png")
+    @patch("posthog.tasks.exports.image_exporter._export_to_image")
     @patch("posthog.api.exports.exporter")
     @freeze_time("2021-08-25T22:09:14.252Z")
-    def test_can_create_new_valid_export_insight(self, mock_exporter_task, mock_export_to_png) -> None:
+    def test_can_create_new_valid_export_insight(self, mock_exporter_task, mock_export_to_image) -> None:
         response = self.client.post(
             f"/api/projects/{self.team.id}/exports",
             {"export_format": "image/png", "insight": self.insight.id},
@@ -171,6 +186,7 @@ class TestExports(APIBaseTest):
                 "has_content": False,
                 "dashboard": None,
                 "export_context": None,
+                "force_refresh": False,
                 "expires_after": (now() + timedelta(weeks=26))
                 .replace(hour=0, minute=0, second=0, microsecond=0)
                 .isoformat()
@@ -223,7 +239,7 @@ class TestExports(APIBaseTest):
 
             # Should warm up the cache
             export_image(exported_asset)
-            mock_export_to_png.assert_called_once_with(exported_asset)
+            mock_export_to_image.assert_called_once_with(exported_asset)
 
             mock_process_query_dict.assert_called_once()
 
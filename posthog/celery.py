@@ -1,4 +1,5 @@
 import os
+import sys
 import time
 
 import structlog
@@ -11,6 +12,7 @@ from celery.signals import (
     task_retry,
     task_success,
     worker_process_init,
+    worker_process_shutdown,
 )
 from django.dispatch import receiver
 from django_structlog.celery import signals
@@ -107,6 +109,15 @@ def on_worker_start(**kwargs) -> None:
     start_http_server(int(os.getenv("CELERY_METRICS_PORT", "8001")))
 
 
+@worker_process_shutdown.connect
+def on_worker_shutdown(**kwargs) -> None:
+    # Pool processes exit via os._exit, so atexit handlers never run and the image exporter's
+    # warm Chrome instances would be orphaned. Only drain if this process ever exported an image.
+    image_exporter = sys.modules.get("posthog.tasks.exports.image_exporter")
+    if image_exporter is not None:
+        image_exporter.drain_driver_pool()
+
+
 # Set up clickhouse query instrumentation
 @task_prerun.connect
 def prerun_signal_handler(task_id, task, **kwargs):
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.18 on 2026-10-15 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("posthog", "0676_team_session_recording_masking_config"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="exportedasset",
+            name="force_refresh",
+            field=models.BooleanField(blank=True, default=False, null=True),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.18 on 2026-10-15 09:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("posthog", "0677_exportedasset_force_refresh"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="exportedasset",
+            name="export_format",
+            field=models.CharField(
+                choices=[
+                    ("image/png", "image/png"),
+                    ("image/jpeg", "image/jpeg"),
+                    ("application/pdf", "application/pdf"),
+                    ("text/csv", "text/csv"),
+                    (
+                        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                    ),
+                ],
+                max_length=100,
+            ),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.18 on 2026-10-15 10:05
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False  # Added to support concurrent index creation
+
+    dependencies = [
+        ("posthog", "0678_alter_exportedasset_export_format"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="exportedasset",
+            name="content_hash",
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        AddIndexConcurrently(
+            model_name="exportedasset",
+            index=models.Index(fields=["team_id", "content_hash"], name="posthog_exp_team_id_26a003_idx"),
+        ),
+    ]
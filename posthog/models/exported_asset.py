@@ -38,6 +38,7 @@ class ExportedAssetManager(models.Manager):
 class ExportedAsset(models.Model):
     class ExportFormat(models.TextChoices):
         PNG = "image/png", "image/png"
+        JPEG = "image/jpeg", "image/jpeg"
         PDF = "application/pdf", "application/pdf"
         CSV = "text/csv", "text/csv"
         XLSX = (
@@ -45,7 +46,7 @@ class ExportedAsset(models.Model):
             "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         )
 
-    SUPPORTED_FORMATS = [ExportFormat.PNG, ExportFormat.CSV, ExportFormat.XLSX]
+    SUPPORTED_FORMATS = [ExportFormat.PNG, ExportFormat.JPEG, ExportFormat.CSV, ExportFormat.XLSX]
 
     # Relations
     team = models.ForeignKey("Team", on_delete=models.CASCADE)
@@ -67,6 +68,10 @@ class ExportedAsset(models.Model):
     # path in object storage or some other location identifier for the asset
     # 1000 characters would hold a 20 UUID forward slash separated path with space to spare
     content_location = models.TextField(null=True, blank=True, max_length=1000)
+    # image exports re-use recently cached insight results unless this is set
+    force_refresh = models.BooleanField(default=False, null=True, blank=True)
+    # identifies what was rendered into an image export, so unchanged exports can re-use earlier content
+    content_hash = models.CharField(max_length=64, null=True, blank=True)
 
     # DEPRECATED: We now use JWT for accessing assets
     access_token = models.CharField(max_length=400, null=True, blank=True, default=get_default_access_token)
@@ -75,6 +80,11 @@ class ExportedAsset(models.Model):
     objects = ExportedAssetManager()
     objects_including_ttl_deleted: models.Manager["ExportedAsset"] = models.Manager()
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["team_id", "content_hash"], name="posthog_exp_team_id_26a003_idx"),
+        ]
+
     @property
     def has_content(self):
         return self.content is not None or self.content_location is not None
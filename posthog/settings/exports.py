@@ -0,0 +1,9 @@
+from posthog.settings import get_from_env
+from posthog.utils import str_to_bool
+
+# Number of warm Chrome instances each worker process keeps around for image exports
+IMAGE_EXPORTER_POOL_SIZE: int = get_from_env("IMAGE_EXPORTER_POOL_SIZE", 1, type_cast=int)
+# Chrome slowly leaks memory (GPU/angle buffers), so we recycle a driver after this many screenshots
+IMAGE_EXPORTER_MAX_DRIVER_USES: int = get_from_env("IMAGE_EXPORTER_MAX_DRIVER_USES", 50, type_cast=int)
+# Export the insights of a dashboard subscription concurrently rather than one after the other
+IMAGE_EXPORT_PARALLEL_TILES: bool = get_from_env("IMAGE_EXPORT_PARALLEL_TILES", False, type_cast=str_to_bool)
@@ -36,6 +36,18 @@ EXPORT_TIMER = Histogram(
     labelnames=["type"],
     buckets=(1, 5, 10, 30, 60, 120, 240, 300, 360, 420, 480, 540, 600, float("inf")),
 )
+EXPORT_IMAGE_PHASE_TIMER = Histogram(
+    "exporter_image_phase_duration_seconds",
+    "Time spent in each phase of taking an image export screenshot",
+    labelnames=["phase"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, float("inf")),
+)
+EXPORT_IMAGE_SIZE_BYTES = Histogram(
+    "exporter_image_size_bytes",
+    "Size of the exported images",
+    labelnames=["format"],
+    buckets=(10_000, 50_000, 100_000, 250_000, 500_000, 1_000_000, 2_500_000, 5_000_000, 10_000_000, float("inf")),
+)
 
 
 # export_asset is used in chords/groups and so must not ignore its results
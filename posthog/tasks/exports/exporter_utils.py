@@ -5,10 +5,13 @@ import requests
 import structlog
 
 from django.conf import settings
+from django.core.cache import cache
 
 logger = structlog.get_logger(__name__)
 
 
+RENDER_DURATION_CACHE_TTL = 60 * 60 * 24 * 7  # 1 week
+
 _site_reachable = None
 _site_reachable_exception: Optional[Exception] = None
 _site_reachable_checked_at: Optional[datetime] = None
@@ -55,3 +58,23 @@ def log_error_if_site_url_not_reachable() -> None:
             site_url=settings.SITE_URL,
             exception=_site_reachable_exception,
         )
+
+
+def _render_duration_cache_key(insight_id: int) -> str:
+    return f"image_exporter:render_duration:{insight_id}"
+
+
+def record_render_duration(insight_id: int, duration: float) -> None:
+    cache.set(_render_duration_cache_key(insight_id), duration, RENDER_DURATION_CACHE_TTL)
+
+
+def get_render_durations(insight_ids: list[int]) -> dict[int, float]:
+    """
+    Returns how long the last image export of each insight took, for those we have seen recently
+    """
+    cached = cache.get_many([_render_duration_cache_key(insight_id) for insight_id in insight_ids])
+    return {
+        insight_id: cached[_render_duration_cache_key(insight_id)]
+        for insight_id in insight_ids
+        if _render_duration_cache_key(insight_id) in cached
+    }
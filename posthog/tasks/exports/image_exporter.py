@@ -1,18 +1,32 @@
+import atexit
+import base64
+import functools
+import hashlib
 import json
+import math
 import os
-import uuid
+import queue
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
 from datetime import timedelta
-from typing import Literal, Optional
+from io import BytesIO
+from typing import Any, Literal, Optional, Union
+from urllib.parse import urlparse
 
+import requests
+import oxipng
 import structlog
+import websocket
 from django.conf import settings
+from PIL import Image
+from pydantic import BaseModel
 from selenium import webdriver
-from selenium.common.exceptions import TimeoutException
-from selenium.webdriver.common.by import By
+from selenium.common.exceptions import SessionNotCreatedException, TimeoutException, WebDriverException
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.support.wait import WebDriverWait
-from sentry_sdk import configure_scope, push_scope
+from sentry_sdk import configure_scope, push_scope, set_tag
 from webdriver_manager.chrome import ChromeDriverManager
 from webdriver_manager.core.os_manager import ChromeType
 
@@ -26,24 +40,105 @@ from posthog.models.exported_asset import (
     get_public_access_token,
     save_content,
 )
+from posthog.storage import object_storage
 from posthog.tasks.exporter import (
     EXPORT_SUCCEEDED_COUNTER,
     EXPORT_FAILED_COUNTER,
+    EXPORT_IMAGE_PHASE_TIMER,
+    EXPORT_IMAGE_SIZE_BYTES,
     EXPORT_TIMER,
 )
-from posthog.tasks.exports.exporter_utils import log_error_if_site_url_not_reachable
+from posthog.tasks.exports.exporter_utils import log_error_if_site_url_not_reachable, record_render_duration
 from posthog.utils import absolute_uri
 
 logger = structlog.get_logger(__name__)
 
-TMP_DIR = "/tmp"  # NOTE: Externalise this to ENV var
-
 ScreenWidth = Literal[800, 1920]
 CSSSelector = Literal[".InsightCard", ".ExportedInsight"]
+ImageFormat = Literal["png", "jpeg"]
+
+JPEG_QUALITY = 85
+# Rendering anything taller than this in one go needs a framebuffer big enough to stall or crash Chrome,
+# so taller pages are captured in slices of at most this height and stitched together
+MAX_SCREENSHOT_HEIGHT_PX = 8192
+# Generous, as some commands (e.g. waiting for the page to render) are awaited in the page
+CDP_TIMEOUT_SECONDS = 60
+
+
+# Remembers where ChromeDriverManager put chromedriver so that new worker processes don't have to ask it again
+CHROMEDRIVER_PATH_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".cache", "posthog", "chromedriver_path")
+
+
+@functools.lru_cache(maxsize=1)
+def _resolved_chromedriver_path() -> str:
+    # ChromeDriverManager hits the network and scans the filesystem on every install() call, so only do it once
+    if os.environ.get("CHROMEDRIVER_BIN"):
+        return os.environ["CHROMEDRIVER_BIN"]
+
+    try:
+        with open(CHROMEDRIVER_PATH_CACHE_FILE) as cache_file:
+            cached_path = cache_file.read().strip()
+        if cached_path and os.path.exists(cached_path):
+            return cached_path
+    except OSError:
+        pass
+
+    path = ChromeDriverManager(chrome_type=ChromeType.GOOGLE).install()
+
+    try:
+        os.makedirs(os.path.dirname(CHROMEDRIVER_PATH_CACHE_FILE), exist_ok=True)
+        with open(CHROMEDRIVER_PATH_CACHE_FILE, "w") as cache_file:
+            cache_file.write(path)
+    except OSError:
+        logger.warning("image_exporter.chromedriver_path_not_cached", exc_info=True)
+
+    return path
+
+
+def _forget_chromedriver_path() -> None:
+    try:
+        os.remove(CHROMEDRIVER_PATH_CACHE_FILE)
+    except FileNotFoundError:
+        pass
+    _resolved_chromedriver_path.cache_clear()
+
+
+CHROME_DISABLED_SUBSYSTEM_ARGUMENTS = [
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--disable-translate",
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--disable-crash-reporter",
+    "--disable-breakpad",
+    "--metrics-recording-only",
+    "--mute-audio",
+    # The window is never visible, so make sure Chrome never deprioritises rendering it
+    "--disable-renderer-backgrounding",
+    "--disable-background-timer-throttling",
+    "--disable-backgrounding-occluded-windows",
+    "--disable-ipc-flooding-protection",
+]
+# Chrome only respects the last --disable-features flag, so all features to disable need to be in this one list.
+# We only ever load our own exporter page, so site isolation just means spawning extra renderer processes.
+CHROME_DISABLED_FEATURES = ["TranslateUI", "IsolateOrigins", "site-per-process", "OptimizationGuideModelDownloading"]
+
+
+# Docker and Kubernetes default to a 64MB /dev/shm which big dashboards easily exhaust
+MIN_SHARED_MEMORY_BYTES = 512 * 1024 * 1024
+
+
+@functools.lru_cache(maxsize=1)
+def _has_enough_shared_memory() -> bool:
+    try:
+        stats = os.statvfs("/dev/shm")
+    except OSError:
+        return False
+    return stats.f_frsize * stats.f_blocks >= MIN_SHARED_MEMORY_BYTES
 
 
-# NOTE: We purposefully DON'T re-use the driver. It would be slightly faster but would keep an in-memory browser
-# window permanently around which is unnecessary
 def get_driver() -> webdriver.Chrome:
     options = Options()
     options.add_argument("--headless=new")  # Hint: Try removing this line when debugging
@@ -52,31 +147,194 @@ def get_driver() -> webdriver.Chrome:
     options.add_argument("--disable-software-rasterizer")
     options.add_argument("--no-sandbox")
     options.add_argument("--disable-gpu")
-    options.add_argument("--disable-dev-shm-usage")  # This flag can make things slower but more reliable
+    if not _has_enough_shared_memory():
+        # Makes Chrome use /tmp instead, which is slower but won't crash when /dev/shm fills up
+        options.add_argument("--disable-dev-shm-usage")
+    # Nothing below is needed to render a page, and each of them costs startup time and memory per instance
+    for argument in CHROME_DISABLED_SUBSYSTEM_ARGUMENTS:
+        options.add_argument(argument)
+    options.add_argument(f"--disable-features={','.join(CHROME_DISABLED_FEATURES)}")
     options.add_experimental_option(
         "excludeSwitches", ["enable-automation"]
     )  # Removes the "Chrome is being controlled by automated test software" bar
+    options.add_experimental_option("prefs", {"profile.default_content_setting_values.notifications": 2})
+    # Don't block driver.get until every subresource (fonts, analytics...) has loaded,
+    # waiting for the insight or dashboard to render tells us when the page is ready
+    options.page_load_strategy = "eager"
 
-    if os.environ.get("CHROMEDRIVER_BIN"):
-        service = webdriver.ChromeService(executable_path=os.environ["CHROMEDRIVER_BIN"])
-        return webdriver.Chrome(service=service, options=options)
+    try:
+        return webdriver.Chrome(service=Service(_resolved_chromedriver_path()), options=options)
+    except SessionNotCreatedException:
+        if os.environ.get("CHROMEDRIVER_BIN"):
+            raise
+        # Chrome was most likely upgraded since the cached chromedriver was installed, fetch a matching one
+        logger.warning("image_exporter.chromedriver_outdated", exc_info=True)
+        _forget_chromedriver_path()
+        return webdriver.Chrome(service=Service(_resolved_chromedriver_path()), options=options)
+
+
+class _CDPSession:
+    """
+    A DevTools websocket connection straight to the page, skipping the hop through chromedriver's HTTP API
+    that every execute_cdp_cmd/execute_script call would otherwise make.
+    """
+
+    def __init__(self, websocket_url: str) -> None:
+        # Chrome rejects DevTools connections with an Origin header unless --remote-allow-origins is set
+        self._ws = websocket.create_connection(websocket_url, timeout=CDP_TIMEOUT_SECONDS, suppress_origin=True)
+        self._next_id = 0
+
+    @classmethod
+    def for_driver(cls, driver: webdriver.Chrome) -> "_CDPSession":
+        debugger_address = driver.capabilities["goog:chromeOptions"]["debuggerAddress"]
+        targets = requests.get(f"http://{debugger_address}/json", timeout=5).json()
+        page = next(target for target in targets if target["type"] == "page")
+        return cls(page["webSocketDebuggerUrl"])
+
+    def send(self, method: str, params: dict) -> dict:
+        self._next_id += 1
+        message_id = self._next_id
+        self._ws.send(json.dumps({"id": message_id, "method": method, "params": params}))
+        while True:
+            message = json.loads(self._ws.recv())
+            # Skip events and responses to commands we've given up on
+            if message.get("id") != message_id:
+                continue
+            if "error" in message:
+                raise WebDriverException(f"{method} failed: {message['error']}")
+            return message["result"]
+
+    def close(self) -> None:
+        try:
+            self._ws.close()
+        except Exception:
+            pass
 
-    return webdriver.Chrome(
-        service=Service(ChromeDriverManager(chrome_type=ChromeType.GOOGLE).install()),
-        options=options,
-    )
+
+class _DriverPool:
+    """
+    Keeps a few warm Chrome instances around so that each export doesn't pay for a cold browser start.
+    Drivers are recycled after `max_uses` screenshots or as soon as they've been involved in a failure.
+    """
+
+    def __init__(self, size: int, max_uses: int) -> None:
+        self._lock = threading.Lock()
+        self._idle: queue.Queue[webdriver.Chrome] = queue.Queue(maxsize=size)
+        self._uses: dict[webdriver.Chrome, int] = {}
+        # None marks drivers whose DevTools connection couldn't be opened, they stick to execute_cdp_cmd
+        self._cdp_sessions: dict[webdriver.Chrome, Optional[_CDPSession]] = {}
+        self._max_uses = max_uses
+
+    def acquire(self) -> webdriver.Chrome:
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            # Chrome may have crashed or been OOM killed while it was sitting idle
+            try:
+                driver.current_url
+                return driver
+            except Exception:
+                logger.warning("image_exporter.idle_driver_dead", exc_info=True)
+                self._discard(driver)
+
+        driver = get_driver()
+        with self._lock:
+            self._uses[driver] = 0
+        return driver
+
+    def release(self, driver: webdriver.Chrome, healthy: bool = True) -> None:
+        with self._lock:
+            uses = self._uses.get(driver, 0) + 1
+            self._uses[driver] = uses
+
+        if healthy and uses < self._max_uses:
+            try:
+                # Make sure nothing from this export leaks into the next one, which may be for another team
+                self._clear_origin_storage(driver)
+                driver.delete_all_cookies()
+                driver.get("about:blank")
+                self._idle.put_nowait(driver)
+                return
+            except queue.Full:
+                pass
+            except Exception:
+                logger.warning("image_exporter.driver_reset_failed", exc_info=True)
+
+        self._discard(driver)
+
+    def _clear_origin_storage(self, driver: webdriver.Chrome) -> None:
+        url = urlparse(driver.current_url)
+        if url.scheme not in ("http", "https"):
+            return
+
+        # Covers localStorage, sessionStorage, IndexedDB, cache storage, service workers...
+        params = {"origin": f"{url.scheme}://{url.netloc}", "storageTypes": "all"}
+        session = self.cdp_session(driver)
+        if session is None:
+            driver.execute_cdp_cmd("Storage.clearDataForOrigin", params)
+        else:
+            session.send("Storage.clearDataForOrigin", params)
+
+    def cdp_session(self, driver: webdriver.Chrome) -> Optional[_CDPSession]:
+        """
+        Returns the (lazily opened) DevTools connection of a pooled driver, or None if one can't be used
+        """
+        with self._lock:
+            if driver not in self._uses:
+                return None
+            if driver in self._cdp_sessions:
+                return self._cdp_sessions[driver]
+
+        try:
+            session: Optional[_CDPSession] = _CDPSession.for_driver(driver)
+        except Exception:
+            logger.warning("image_exporter.cdp_session_failed", exc_info=True)
+            session = None
+        with self._lock:
+            self._cdp_sessions[driver] = session
+
+        return session
+
+    def drain(self) -> None:
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._discard(driver)
+
+    def _discard(self, driver: webdriver.Chrome) -> None:
+        with self._lock:
+            self._uses.pop(driver, None)
+            session = self._cdp_sessions.pop(driver, None)
+        if session:
+            session.close()
+        try:
+            driver.quit()
+        except Exception:
+            logger.warning("image_exporter.driver_quit_failed", exc_info=True)
 
 
-def _export_to_png(exported_asset: ExportedAsset) -> None:
+_DRIVER_POOL = _DriverPool(size=settings.IMAGE_EXPORTER_POOL_SIZE, max_uses=settings.IMAGE_EXPORTER_MAX_DRIVER_USES)
+# Celery pool processes skip atexit handlers, they drain the pool via the worker_process_shutdown signal instead
+atexit.register(_DRIVER_POOL.drain)
+
+
+def drain_driver_pool() -> None:
+    _DRIVER_POOL.drain()
+
+
+def _export_to_image(exported_asset: ExportedAsset) -> bool:
     """
     Exporting an Insight means:
     1. Loading the Insight from the web app in a dedicated rendering mode
-    2. Waiting for the page to have fully loaded before taking a screenshot to disk
-    3. Loading that screenshot into memory and saving the data representation to the relevant Insight
-    4. Cleanup: Remove the old file and close the browser session
-    """
+    2. Waiting for the page to have fully loaded before taking a screenshot
+    3. Saving the screenshot's data representation to the relevant Insight
 
-    image_path = None
+    Returns whether the page had fully loaded by the time the screenshot was taken.
+    """
 
     try:
         if not settings.SITE_URL:
@@ -84,16 +342,13 @@ def _export_to_png(exported_asset: ExportedAsset) -> None:
                 "The SITE_URL is not set. The exporter must have HTTP access to the web app in order to work"
             )
 
-        image_id = str(uuid.uuid4())
-        image_path = os.path.join(TMP_DIR, f"{image_id}.png")
-
-        if not os.path.exists(TMP_DIR):
-            os.makedirs(TMP_DIR)
-
         access_token = get_public_access_token(exported_asset, timedelta(minutes=15))
 
         screenshot_width: ScreenWidth
         wait_for_css_selector: CSSSelector
+        image_format: ImageFormat = "jpeg" if exported_asset.export_format == ExportedAsset.ExportFormat.JPEG else "png"
+        # The 1920px wide dashboards are high res enough as is, and rendering them at 2x quadruples the pixel count
+        scale_factor = 2
 
         if exported_asset.insight is not None:
             url_to_render = absolute_uri(f"/exporter?token={access_token}&legend")
@@ -103,111 +358,284 @@ def _export_to_png(exported_asset: ExportedAsset) -> None:
             url_to_render = absolute_uri(f"/exporter?token={access_token}")
             wait_for_css_selector = ".InsightCard"
             screenshot_width = 1920
+            scale_factor = 1
         else:
             raise Exception(f"Export is missing required dashboard or insight ID")
 
-        logger.info("exporting_asset", asset_id=exported_asset.id, render_url=url_to_render)
-
-        _screenshot_asset(image_path, url_to_render, screenshot_width, wait_for_css_selector)
-
-        with open(image_path, "rb") as image_file:
-            image_data = image_file.read()
+        phase_timings: dict[str, float] = {}
+        image_data, render_complete = _screenshot_asset(
+            url_to_render,
+            screenshot_width,
+            wait_for_css_selector,
+            image_format,
+            scale_factor=scale_factor,
+            phase_timings=phase_timings,
+        )
+        if image_format == "png":
+            # Chrome's optimizeForSpeed PNGs are barely compressed, oxipng makes up for that much faster than zlib would
+            with _timed_phase("optimize", phase_timings):
+                image_data = _optimize_png(image_data)
+        EXPORT_IMAGE_SIZE_BYTES.labels(format=image_format).observe(len(image_data))
 
         save_content(exported_asset, image_data)
 
-        os.remove(image_path)
+        logger.info(
+            "image_exporter.completed",
+            asset_id=exported_asset.id,
+            render_url=url_to_render,
+            phases=phase_timings,
+            size=len(image_data),
+            render_complete=render_complete,
+        )
+        return render_complete
 
     except Exception:
-        # Ensure we clean up the tmp file in case anything went wrong
-        if image_path and os.path.exists(image_path):
-            os.remove(image_path)
-
         log_error_if_site_url_not_reachable()
 
         raise
 
 
-# Newer versions of selenium seem to include the search bar in the height calculation.
-# This is a manually determined offset to ensure the screenshot is the correct height.
-# See https://github.com/SeleniumHQ/selenium/issues/14660.
-HEIGHT_OFFSET = 85
+# Page height to start rendering with, the page is resized to fit its content once it has rendered
+INITIAL_VIEWPORT_HEIGHT = 600
+
+# Resolves once `condition` is truthy, re-checking on every DOM mutation instead of polling from Python.
+# Resolves to the final value of `condition` if it hasn't become truthy within `timeoutMs`.
+WAIT_FOR_CONDITION_JS = """
+new Promise(resolve => {
+    const check = () => Boolean(%(condition)s);
+    if (check()) {
+        return resolve(true);
+    }
+    const timer = setTimeout(() => {
+        observer.disconnect();
+        resolve(check());
+    }, %(timeout_ms)d);
+    const observer = new MutationObserver(() => {
+        if (check()) {
+            observer.disconnect();
+            clearTimeout(timer);
+            resolve(true);
+        }
+    });
+    observer.observe(document, { subtree: true, childList: true, attributes: true });
+})
+"""
+
+
+MEASURE_HEIGHT_JS = """
+const measureHeight = () => {
+    const element = document.querySelector('.InsightCard__viz') || document.querySelector('.ExportedInsight__content');
+    if (element) {
+        const rect = element.getBoundingClientRect();
+        return Math.max(rect.height, document.body.scrollHeight);
+    }
+    return document.body.scrollHeight;
+};
+"""
+
+MEASURE_PAGE_JS = (
+    "(() => {"
+    + MEASURE_HEIGHT_JS
+    + """
+const tableElement = document.querySelector('table');
+return { height: measureHeight(), tableWidth: tableElement ? tableElement.offsetWidth * 1.5 : null };
+})()"""
+)
+
+# Waits (for at most 500ms) until the page is done loading, then for two animation frames so that
+# any layout changes triggered by the resize have been painted, and returns the resulting height
+SETTLE_LAYOUT_JS = (
+    "new Promise(done => {"
+    + MEASURE_HEIGHT_JS
+    + """
+const deadline = Date.now() + 500;
+const waitForSettle = () => {
+    if ((document.readyState === 'complete' && !document.querySelector('.Spinner')) || Date.now() >= deadline) {
+        requestAnimationFrame(() => requestAnimationFrame(() => done(measureHeight())));
+    } else {
+        setTimeout(waitForSettle, 50);
+    }
+};
+waitForSettle();
+})"""
+)
+
+
+def _execute_cdp_cmd(driver: webdriver.Chrome, cmd: str, params: dict) -> dict:
+    session = _DRIVER_POOL.cdp_session(driver)
+    if session is None:
+        return driver.execute_cdp_cmd(cmd, params)
+    return session.send(cmd, params)
+
+
+def _evaluate(driver: webdriver.Chrome, expression: str) -> Any:
+    """
+    Evaluates a JS expression in the page (awaiting it if it's a promise) and returns its JSON value
+    """
+    result = _execute_cdp_cmd(
+        driver, "Runtime.evaluate", {"expression": expression, "awaitPromise": True, "returnByValue": True}
+    )
+    if "exceptionDetails" in result:
+        raise WebDriverException(f"JavaScript error: {result['exceptionDetails']}")
+    return result.get("result", {}).get("value")
+
+
+def _wait_until(driver: webdriver.Chrome, condition: str, timeout: int = 20) -> None:
+    """
+    Waits for a JS expression to become truthy in a single CDP round trip.
+    Raises a TimeoutException like WebDriverWait would if it doesn't happen in time.
+    """
+    if not _evaluate(driver, WAIT_FOR_CONDITION_JS % {"condition": condition, "timeout_ms": timeout * 1000}):
+        raise TimeoutException(f"Timed out after {timeout}s waiting for {condition}")
+
+
+def _capture_screenshot(driver: webdriver.Chrome, width: int, height: int, image_format: ImageFormat) -> bytes:
+    if height <= MAX_SCREENSHOT_HEIGHT_PX:
+        return _capture_region(driver, 0, width, height, image_format)
+
+    # The viewport is capped at MAX_SCREENSHOT_HEIGHT_PX, so scroll each slice into view to get it painted.
+    # Clips are in document coordinates regardless of the scroll position.
+    # Capture losslessly, the stitched image gets encoded in the requested format once at the end
+    slices = []
+    for y in range(0, height, MAX_SCREENSHOT_HEIGHT_PX):
+        _evaluate(driver, f"window.scrollTo(0, {y})")
+        slice_height = min(MAX_SCREENSHOT_HEIGHT_PX, height - y)
+        slices.append(Image.open(BytesIO(_capture_region(driver, y, width, slice_height, image_format="png"))))
+    stitched = Image.new("RGB", (slices[0].width, sum(image_slice.height for image_slice in slices)), "white")
+    offset = 0
+    for image_slice in slices:
+        stitched.paste(image_slice, (0, offset))
+        offset += image_slice.height
+
+    output = BytesIO()
+    if image_format == "jpeg":
+        stitched.save(output, format="JPEG", quality=JPEG_QUALITY)
+    else:
+        stitched.save(output, format="PNG")
+    return output.getvalue()
+
+
+def _capture_region(driver: webdriver.Chrome, y: int, width: int, height: int, image_format: ImageFormat) -> bytes:
+    # Unlike save_screenshot, this lets Chrome favour encoding speed over file size
+    params: dict = {
+        "format": image_format,
+        "optimizeForSpeed": True,
+        "captureBeyondViewport": False,
+        "clip": {"x": 0, "y": y, "width": width, "height": height, "scale": 1},
+    }
+    if image_format == "jpeg":
+        params["quality"] = JPEG_QUALITY
+
+    result = _execute_cdp_cmd(driver, "Page.captureScreenshot", params)
+    return base64.b64decode(result["data"])
+
+
+def _optimize_png(image_data: bytes) -> bytes:
+    try:
+        return oxipng.optimize_from_memory(image_data, level=2, strip=oxipng.StripChunks.safe())
+    except oxipng.PngError:
+        # The unoptimized image is still perfectly usable
+        logger.warning("image_exporter.png_optimization_failed", exc_info=True)
+        return image_data
+
+
+def _set_viewport(driver: webdriver.Chrome, width: int, height: int, scale_factor: int) -> None:
+    """
+    Emulates the viewport rather than resizing the window. Unlike a window resize this is a single CDP call,
+    doesn't depend on the size of the browser UI around the page, and lets pooled drivers serve both
+    insight and dashboard exports with their own scale factor.
+    """
+    _execute_cdp_cmd(
+        driver,
+        "Emulation.setDeviceMetricsOverride",
+        {"width": width, "height": height, "deviceScaleFactor": scale_factor, "mobile": False},
+    )
+
+
+@contextmanager
+def _timed_phase(phase: str, phase_timings: dict[str, float]) -> Iterator[None]:
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        duration = time.monotonic() - start
+        phase_timings[phase] = phase_timings.get(phase, 0) + duration
+        EXPORT_IMAGE_PHASE_TIMER.labels(phase=phase).observe(duration)
 
 
 def _screenshot_asset(
-    image_path: str,
     url_to_render: str,
     screenshot_width: ScreenWidth,
     wait_for_css_selector: CSSSelector,
-) -> None:
+    image_format: ImageFormat = "png",
+    scale_factor: int = 2,
+    phase_timings: Optional[dict[str, float]] = None,
+) -> tuple[bytes, bool]:
+    """
+    Returns the screenshot along with whether the page had finished loading when it was taken
+    """
+    if phase_timings is None:
+        phase_timings = {}
     driver: Optional[webdriver.Chrome] = None
+    healthy = False
+    render_complete = True
     try:
-        driver = get_driver()
-        # Set initial window size with a more reasonable height to prevent initial rendering issues
-        driver.set_window_size(screenshot_width, 600)
-        driver.get(url_to_render)
-        WebDriverWait(driver, 20).until(lambda x: x.find_element(By.CSS_SELECTOR, wait_for_css_selector))
-        # Also wait until nothing is loading
+        with _timed_phase("driver_start", phase_timings):
+            driver = _DRIVER_POOL.acquire()
+        # Set an initial viewport with a more reasonable height to prevent initial rendering issues
+        _set_viewport(driver, screenshot_width, INITIAL_VIEWPORT_HEIGHT, scale_factor)
+        with _timed_phase("page_load", phase_timings):
+            driver.get(url_to_render)
+        # Wait for the insight or dashboard to be there with nothing loading anymore, both share the one time budget
+        rendered_element = f"document.querySelector({json.dumps(wait_for_css_selector)})"
         try:
-            WebDriverWait(driver, 20).until_not(lambda x: x.find_element(By.CLASS_NAME, "Spinner"))
+            with _timed_phase("render_wait", phase_timings):
+                _wait_until(driver, f"{rendered_element} && !document.querySelector('.Spinner')")
         except TimeoutException:
+            # Without the element there is nothing worth taking a screenshot of,
+            # whereas a spinner that never goes away shouldn't stop us from exporting the rest
+            if not _evaluate(driver, f"Boolean({rendered_element})"):
+                raise
+            render_complete = False
             logger.exception(
                 "image_exporter.timeout",
                 url_to_render=url_to_render,
                 wait_for_css_selector=wait_for_css_selector,
-                image_path=image_path,
             )
             with push_scope() as scope:
                 scope.set_extra("url_to_render", url_to_render)
                 try:
-                    driver.save_screenshot(image_path)
-                    scope.add_attachment(None, None, image_path)
+                    scope.add_attachment(driver.get_screenshot_as_png(), "screenshot.png")
                 except Exception:
                     pass
                 capture_exception()
 
-        # Get the height of the visualization container specifically
-        height = driver.execute_script("""
-            const element = document.querySelector('.InsightCard__viz') || document.querySelector('.ExportedInsight__content');
-            if (element) {
-                const rect = element.getBoundingClientRect();
-                return Math.max(rect.height, document.body.scrollHeight);
-            }
-            return document.body.scrollHeight;
-        """)
-
-        # For example funnels use a table that can get very wide, so try to get its width
-        width = driver.execute_script(
-            """
-            tableElement = document.querySelector('table');
-            if (tableElement) {
-                return tableElement.offsetWidth * 1.5;
-            }
-        """
-        )
+        # Get the height of the visualization container specifically and, as for example funnels use a table
+        # that can get very wide, the width of any table
+        with _timed_phase("measure", phase_timings):
+            measurements = _evaluate(driver, MEASURE_PAGE_JS)
+        height = math.ceil(measurements["height"])
+        width = measurements["tableWidth"]
         if isinstance(width, int):
             width = max(int(screenshot_width), min(1800, width or screenshot_width))
         else:
             width = screenshot_width
 
-        # Set window size with the calculated dimensions
-        driver.set_window_size(width, height + HEIGHT_OFFSET)
-
-        # Allow a moment for any dynamic resizing
-        driver.execute_script("return new Promise(resolve => setTimeout(resolve, 500))")
-
-        # Get the final height after any dynamic adjustments
-        final_height = driver.execute_script("""
-            const element = document.querySelector('.InsightCard__viz') || document.querySelector('.ExportedInsight__content');
-            if (element) {
-                const rect = element.getBoundingClientRect();
-                return Math.max(rect.height, document.body.scrollHeight);
-            }
-            return document.body.scrollHeight;
-        """)
-
-        # Set final window size
-        driver.set_window_size(width, final_height + HEIGHT_OFFSET)
-        driver.save_screenshot(image_path)
+        # Set viewport size with the calculated dimensions
+        with _timed_phase("resize", phase_timings):
+            _set_viewport(driver, width, min(height, MAX_SCREENSHOT_HEIGHT_PX), scale_factor)
+
+        # Allow a moment for any dynamic resizing and get the final height after any dynamic adjustments
+        with _timed_phase("settle", phase_timings):
+            final_height = math.ceil(_evaluate(driver, SETTLE_LAYOUT_JS))
+
+        # Set final viewport size, very tall pages are captured in slices beyond the viewport
+        with _timed_phase("resize", phase_timings):
+            _set_viewport(driver, width, min(final_height, MAX_SCREENSHOT_HEIGHT_PX), scale_factor)
+        with _timed_phase("capture", phase_timings):
+            image_data = _capture_screenshot(driver, width, final_height, image_format)
+        healthy = True
+        return image_data, render_complete
     except Exception as e:
         # To help with debugging, add a screenshot and any chrome logs
         with configure_scope() as scope:
@@ -220,8 +648,7 @@ def _screenshot_asset(
                 except Exception:
                     pass
                 try:
-                    driver.save_screenshot(image_path)
-                    scope.add_attachment(None, None, image_path)
+                    scope.add_attachment(driver.get_screenshot_as_png(), "screenshot.png")
                 except Exception:
                     pass
         capture_exception(e)
@@ -229,48 +656,105 @@ def _screenshot_asset(
         raise
     finally:
         if driver:
-            driver.quit()
+            _DRIVER_POOL.release(driver, healthy=healthy)
 
 
-def export_image(exported_asset: ExportedAsset) -> None:
-    with push_scope() as scope:
-        scope.set_tag("team_id", exported_asset.team.pk if exported_asset else "unknown")
-        scope.set_tag("asset_id", exported_asset.id if exported_asset else "unknown")
+def _content_hash(exported_asset: ExportedAsset, query_response: Union[dict, BaseModel]) -> Optional[str]:
+    """
+    Identifies an insight image by the insight's definition and the exact (cached) results it would render
+    """
+    response = query_response if isinstance(query_response, dict) else query_response.__dict__
+    cache_key, last_refresh = response.get("cache_key"), response.get("last_refresh")
+
+    if not exported_asset.insight or not cache_key or not last_refresh:
+        return None
+
+    fingerprint = json.dumps(
+        [
+            exported_asset.export_format,
+            exported_asset.insight.id,
+            exported_asset.insight.last_modified_at.isoformat(),
+            exported_asset.dashboard_id,
+            cache_key,
+            str(last_refresh),
+        ]
+    )
+    return hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()
 
+
+def _reuse_previous_content(exported_asset: ExportedAsset, content_hash: str) -> bool:
+    previous_asset = (
+        ExportedAsset.objects.filter(team_id=exported_asset.team_id, content_hash=content_hash)
+        .exclude(pk=exported_asset.pk)
+        .order_by("-created_at")
+        .first()
+    )
+    if not previous_asset:
+        return False
+
+    content = previous_asset.content
+    if not content and previous_asset.content_location:
         try:
-            if exported_asset.insight:
-                # NOTE: Dashboards are regularly updated but insights are not
-                # so, we need to trigger a manual update to ensure the results are good
-                with conversion_to_query_based(exported_asset.insight):
-                    process_query_dict(
-                        exported_asset.team,
-                        exported_asset.insight.query,
-                        dashboard_filters_json=exported_asset.dashboard.filters if exported_asset.dashboard else None,
-                        limit_context=LimitContext.QUERY_ASYNC,
-                        execution_mode=ExecutionMode.CALCULATE_BLOCKING_ALWAYS,
-                        insight_id=exported_asset.insight.id,
-                        dashboard_id=exported_asset.dashboard.id if exported_asset.dashboard else None,
-                    )
-
-            if exported_asset.export_format == "image/png":
-                with EXPORT_TIMER.labels(type="image").time():
-                    _export_to_png(exported_asset)
-                EXPORT_SUCCEEDED_COUNTER.labels(type="image").inc()
-            else:
-                raise NotImplementedError(
-                    f"Export to format {exported_asset.export_format} is not supported for insights"
+            content = object_storage.read_bytes(previous_asset.content_location)
+        except Exception:
+            logger.warning("image_exporter.previous_content_unreadable", asset_id=exported_asset.id, exc_info=True)
+            return False
+    if not content:
+        return False
+
+    # Copied rather than pointing at the same object, as the previous asset's content expires with it
+    save_content(exported_asset, content)
+    return True
+
+
+def export_image(exported_asset: ExportedAsset) -> None:
+    set_tag("team_id", exported_asset.team.pk if exported_asset else "unknown")
+    set_tag("asset_id", exported_asset.id if exported_asset else "unknown")
+
+    try:
+        # The recorded duration feeds subscription scheduling, so it has to include the query as well as the render
+        start = time.monotonic()
+        content_hash: Optional[str] = None
+        if exported_asset.insight:
+            # NOTE: Dashboards are regularly updated but insights are not
+            # so, we need to trigger an update to ensure the results are good. Results that are still fresh
+            # in the cache are good enough, unless a refresh was explicitly requested
+            with conversion_to_query_based(exported_asset.insight):
+                query_response = process_query_dict(
+                    exported_asset.team,
+                    exported_asset.insight.query,
+                    dashboard_filters_json=exported_asset.dashboard.filters if exported_asset.dashboard else None,
+                    limit_context=LimitContext.QUERY_ASYNC,
+                    execution_mode=ExecutionMode.CALCULATE_BLOCKING_ALWAYS
+                    if exported_asset.force_refresh
+                    else ExecutionMode.RECENT_CACHE_CALCULATE_BLOCKING_IF_STALE,
+                    insight_id=exported_asset.insight.id,
+                    dashboard_id=exported_asset.dashboard.id if exported_asset.dashboard else None,
                 )
-        except Exception as e:
-            if exported_asset:
-                team_id = str(exported_asset.team.id)
-            else:
-                team_id = "unknown"
+            content_hash = _content_hash(exported_asset, query_response)
 
-            with push_scope() as scope:
-                scope.set_tag("celery_task", "image_export")
-                scope.set_tag("team_id", team_id)
-                capture_exception(e)
+        if exported_asset.export_format in (ExportedAsset.ExportFormat.PNG, ExportedAsset.ExportFormat.JPEG):
+            render_complete = True
+            # Scheduled subscriptions regularly export insights whose results haven't changed since last time
+            if content_hash and _reuse_previous_content(exported_asset, content_hash):
+                logger.info("image_exporter.reused_previous_content", asset_id=exported_asset.id)
+            else:
+                with EXPORT_TIMER.labels(type="image").time():
+                    render_complete = _export_to_image(exported_asset)
+                if exported_asset.insight_id:
+                    record_render_duration(exported_asset.insight_id, time.monotonic() - start)
+
+            # A screenshot of a page that was still loading mustn't be handed out to later exports
+            if content_hash and render_complete:
+                exported_asset.content_hash = content_hash
+                exported_asset.save(update_fields=["content_hash"])
+            EXPORT_SUCCEEDED_COUNTER.labels(type="image").inc()
+        else:
+            raise NotImplementedError(f"Export to format {exported_asset.export_format} is not supported for insights")
+    except Exception as e:
+        set_tag("celery_task", "image_export")
+        capture_exception(e)
 
-            logger.error("image_exporter.failed", exception=e, exc_info=True)
-            EXPORT_FAILED_COUNTER.labels(type="image").inc()
-            raise
+        logger.error("image_exporter.failed", exception=e, exc_info=True)
+        EXPORT_FAILED_COUNTER.labels(type="image").inc()
+        raise
@@ -1,9 +1,18 @@
-from unittest.mock import mock_open, patch
+import base64
+import json
+import os
+import tempfile
+from io import BytesIO
+from unittest import TestCase
+from unittest.mock import MagicMock, PropertyMock, patch
 
 from boto3 import resource
 from botocore.client import Config
+from PIL import Image
+from selenium.common.exceptions import SessionNotCreatedException, TimeoutException, WebDriverException
 
-from posthog.models import ExportedAsset, Insight
+from posthog.hogql_queries.query_runner import ExecutionMode
+from posthog.models import Dashboard, ExportedAsset, Insight
 from posthog.settings import (
     OBJECT_STORAGE_ACCESS_KEY_ID,
     OBJECT_STORAGE_BUCKET,
@@ -18,13 +27,7 @@ from posthog.test.base import APIBaseTest
 TEST_PREFIX = "Test-Exports"
 
 
-@patch("posthog.tasks.exports.image_exporter._screenshot_asset")
-@patch(
-    "posthog.tasks.exports.image_exporter.open",
-    new_callable=mock_open,
-    read_data=b"image_data",
-)
-@patch("os.remove")
+@patch("posthog.tasks.exports.image_exporter._screenshot_asset", return_value=(b"image_data", True))
 class TestImageExporter(APIBaseTest):
     exported_asset: ExportedAsset
 
@@ -86,3 +89,435 @@ class TestImageExporter(APIBaseTest):
             assert self.exported_asset.content_location is None
 
             assert self.exported_asset.content == b"image_data"
+
+    @patch("posthog.tasks.exports.image_exporter.process_query_dict")
+    def test_image_exporter_uses_cached_insight_results(self, mock_process_query_dict, *args) -> None:
+        with self.settings(OBJECT_STORAGE_ENABLED=False):
+            image_exporter.export_image(self.exported_asset)
+
+        assert (
+            mock_process_query_dict.call_args.kwargs["execution_mode"]
+            == ExecutionMode.RECENT_CACHE_CALCULATE_BLOCKING_IF_STALE
+        )
+
+    @patch("posthog.tasks.exports.image_exporter.process_query_dict")
+    def test_image_exporter_recalculates_insight_when_forced(self, mock_process_query_dict, *args) -> None:
+        self.exported_asset.force_refresh = True
+        self.exported_asset.save()
+
+        with self.settings(OBJECT_STORAGE_ENABLED=False):
+            image_exporter.export_image(self.exported_asset)
+
+        assert mock_process_query_dict.call_args.kwargs["execution_mode"] == ExecutionMode.CALCULATE_BLOCKING_ALWAYS
+
+    def test_image_exporter_captures_dashboards_as_jpeg(self, mock_screenshot_asset) -> None:
+        dashboard = Dashboard.objects.create(team=self.team)
+        asset = ExportedAsset.objects.create(
+            team=self.team,
+            export_format=ExportedAsset.ExportFormat.JPEG,
+            dashboard=dashboard,
+        )
+
+        with self.settings(OBJECT_STORAGE_ENABLED=False):
+            image_exporter.export_image(asset)
+
+        assert mock_screenshot_asset.call_args.args[1:4] == (1920, ".InsightCard", "jpeg")
+        assert mock_screenshot_asset.call_args.kwargs["scale_factor"] == 1
+        assert asset.content == b"image_data"
+
+    @patch("posthog.tasks.exports.image_exporter.process_query_dict")
+    def test_image_exporter_reuses_content_when_results_are_unchanged(
+        self, mock_process_query_dict, mock_screenshot_asset
+    ) -> None:
+        mock_process_query_dict.return_value = {"cache_key": "cache_abc", "last_refresh": "2026-10-15T10:00:00Z"}
+        with self.settings(OBJECT_STORAGE_ENABLED=False):
+            image_exporter.export_image(self.exported_asset)
+
+            next_asset = ExportedAsset.objects.create(
+                team=self.team,
+                export_format=ExportedAsset.ExportFormat.PNG,
+                insight=self.exported_asset.insight,
+            )
+            image_exporter.export_image(next_asset)
+
+        assert mock_screenshot_asset.call_count == 1
+        assert next_asset.content == b"image_data"
+        assert next_asset.content_hash is not None
+        assert next_asset.content_hash == self.exported_asset.content_hash
+
+    @patch("posthog.tasks.exports.image_exporter.process_query_dict")
+    def test_image_exporter_renders_again_when_results_are_refreshed(
+        self, mock_process_query_dict, mock_screenshot_asset
+    ) -> None:
+        mock_process_query_dict.return_value = {"cache_key": "cache_abc", "last_refresh": "2026-10-15T10:00:00Z"}
+        with self.settings(OBJECT_STORAGE_ENABLED=False):
+            image_exporter.export_image(self.exported_asset)
+
+            mock_process_query_dict.return_value = {"cache_key": "cache_abc", "last_refresh": "2026-10-15T11:00:00Z"}
+            next_asset = ExportedAsset.objects.create(
+                team=self.team,
+                export_format=ExportedAsset.ExportFormat.PNG,
+                insight=self.exported_asset.insight,
+            )
+            image_exporter.export_image(next_asset)
+
+        assert mock_screenshot_asset.call_count == 2
+        assert next_asset.content_hash != self.exported_asset.content_hash
+
+    @patch("posthog.tasks.exports.image_exporter.process_query_dict")
+    def test_image_exporter_renders_again_after_an_incomplete_render(
+        self, mock_process_query_dict, mock_screenshot_asset
+    ) -> None:
+        mock_process_query_dict.return_value = {"cache_key": "cache_abc", "last_refresh": "2026-10-15T10:00:00Z"}
+        mock_screenshot_asset.return_value = (b"still_loading", False)
+        with self.settings(OBJECT_STORAGE_ENABLED=False):
+            image_exporter.export_image(self.exported_asset)
+
+            mock_screenshot_asset.return_value = (b"image_data", True)
+            next_asset = ExportedAsset.objects.create(
+                team=self.team,
+                export_format=ExportedAsset.ExportFormat.PNG,
+                insight=self.exported_asset.insight,
+            )
+            image_exporter.export_image(next_asset)
+
+        assert self.exported_asset.content == b"still_loading"
+        assert self.exported_asset.content_hash is None
+        assert mock_screenshot_asset.call_count == 2
+        assert next_asset.content == b"image_data"
+        assert next_asset.content_hash is not None
+
+
+@patch("posthog.tasks.exports.image_exporter.get_driver")
+class TestDriverPool(TestCase):
+    def setUp(self) -> None:
+        # Fall back to execute_cdp_cmd rather than opening a DevTools websocket
+        cdp_session_patcher = patch.object(image_exporter._CDPSession, "for_driver", side_effect=ConnectionError)
+        self.mock_for_driver = cdp_session_patcher.start()
+        self.addCleanup(cdp_session_patcher.stop)
+
+    def _driver(self) -> MagicMock:
+        return MagicMock(current_url="http://localhost:8010/exporter?token=abc")
+
+    def test_reuses_healthy_driver(self, mock_get_driver) -> None:
+        mock_get_driver.return_value = self._driver()
+        pool = image_exporter._DriverPool(size=1, max_uses=50)
+
+        driver = pool.acquire()
+        pool.release(driver)
+
+        assert pool.acquire() is driver
+        assert mock_get_driver.call_count == 1
+        driver.execute_cdp_cmd.assert_called_once_with(
+            "Storage.clearDataForOrigin", {"origin": "http://localhost:8010", "storageTypes": "all"}
+        )
+        driver.delete_all_cookies.assert_called_once()
+        driver.get.assert_called_once_with("about:blank")
+        driver.quit.assert_not_called()
+
+    def test_discards_driver_after_failure(self, mock_get_driver) -> None:
+        mock_get_driver.side_effect = [self._driver(), self._driver()]
+        pool = image_exporter._DriverPool(size=1, max_uses=50)
+
+        driver = pool.acquire()
+        pool.release(driver, healthy=False)
+
+        driver.quit.assert_called_once()
+        assert pool.acquire() is not driver
+        assert mock_get_driver.call_count == 2
+
+    def test_replaces_idle_driver_that_died(self, mock_get_driver) -> None:
+        mock_get_driver.side_effect = [self._driver(), self._driver()]
+        pool = image_exporter._DriverPool(size=1, max_uses=50)
+
+        driver = pool.acquire()
+        pool.release(driver)
+        type(driver).current_url = PropertyMock(side_effect=WebDriverException("chrome not reachable"))
+
+        assert pool.acquire() is not driver
+        driver.quit.assert_called_once()
+        assert mock_get_driver.call_count == 2
+
+    def test_recycles_driver_after_max_uses(self, mock_get_driver) -> None:
+        mock_get_driver.side_effect = [self._driver(), self._driver()]
+        pool = image_exporter._DriverPool(size=1, max_uses=2)
+
+        driver = pool.acquire()
+        pool.release(driver)
+        assert pool.acquire() is driver
+        pool.release(driver)
+
+        driver.quit.assert_called_once()
+        assert pool.acquire() is not driver
+
+    def test_remembers_failed_cdp_session(self, mock_get_driver) -> None:
+        mock_get_driver.return_value = self._driver()
+        pool = image_exporter._DriverPool(size=1, max_uses=50)
+
+        driver = pool.acquire()
+        assert pool.cdp_session(driver) is None
+        assert pool.cdp_session(driver) is None
+
+        assert self.mock_for_driver.call_count == 1
+
+    def test_drain_quits_idle_drivers(self, mock_get_driver) -> None:
+        mock_get_driver.return_value = self._driver()
+        pool = image_exporter._DriverPool(size=1, max_uses=50)
+
+        driver = pool.acquire()
+        pool.release(driver)
+        pool.drain()
+
+        driver.quit.assert_called_once()
+
+
+class TestWaitUntil(TestCase):
+    def test_returns_when_condition_is_met(self) -> None:
+        driver = MagicMock()
+        driver.execute_cdp_cmd.return_value = {"result": {"type": "boolean", "value": True}}
+
+        image_exporter._wait_until(driver, "document.querySelector('.InsightCard')")
+
+        method, params = driver.execute_cdp_cmd.call_args.args
+        assert method == "Runtime.evaluate"
+        assert params["awaitPromise"] is True
+        assert "document.querySelector('.InsightCard')" in params["expression"]
+
+    def test_raises_timeout_when_condition_is_not_met(self) -> None:
+        driver = MagicMock()
+        driver.execute_cdp_cmd.return_value = {"result": {"type": "boolean", "value": False}}
+
+        with self.assertRaises(TimeoutException):
+            image_exporter._wait_until(driver, "!document.querySelector('.Spinner')", timeout=1)
+
+
+class TestResolvedChromedriverPath(TestCase):
+    def setUp(self) -> None:
+        image_exporter._resolved_chromedriver_path.cache_clear()
+        self.addCleanup(image_exporter._resolved_chromedriver_path.cache_clear)
+
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        self.cache_dir = cache_dir.name
+        self.cache_file = os.path.join(self.cache_dir, "posthog", "chromedriver_path")
+        cache_file_patcher = patch.object(image_exporter, "CHROMEDRIVER_PATH_CACHE_FILE", self.cache_file)
+        cache_file_patcher.start()
+        self.addCleanup(cache_file_patcher.stop)
+
+    @patch("posthog.tasks.exports.image_exporter.ChromeDriverManager")
+    def test_installs_once_and_persists_path(self, mock_driver_manager) -> None:
+        driver_path = os.path.join(self.cache_dir, "chromedriver")
+        open(driver_path, "w").close()
+        mock_driver_manager.return_value.install.return_value = driver_path
+
+        with patch.dict(os.environ, {"CHROMEDRIVER_BIN": ""}):
+            assert image_exporter._resolved_chromedriver_path() == driver_path
+            assert image_exporter._resolved_chromedriver_path() == driver_path
+
+            with open(self.cache_file) as cache_file:
+                assert cache_file.read() == driver_path
+
+            # A fresh process picks the path up from the cache file
+            image_exporter._resolved_chromedriver_path.cache_clear()
+            assert image_exporter._resolved_chromedriver_path() == driver_path
+
+        assert mock_driver_manager.return_value.install.call_count == 1
+
+    @patch("posthog.tasks.exports.image_exporter.Service")
+    @patch("posthog.tasks.exports.image_exporter.webdriver.Chrome")
+    @patch("posthog.tasks.exports.image_exporter.ChromeDriverManager")
+    def test_reinstalls_once_when_cached_driver_is_outdated(
+        self, mock_driver_manager, mock_chrome, mock_service
+    ) -> None:
+        outdated_path = os.path.join(self.cache_dir, "chromedriver-old")
+        open(outdated_path, "w").close()
+        os.makedirs(os.path.dirname(self.cache_file))
+        with open(self.cache_file, "w") as cache_file:
+            cache_file.write(outdated_path)
+        mock_driver_manager.return_value.install.return_value = "/new/chromedriver"
+        driver = MagicMock()
+        mock_chrome.side_effect = [SessionNotCreatedException("version mismatch"), driver]
+
+        with patch.dict(os.environ, {"CHROMEDRIVER_BIN": ""}):
+            assert image_exporter.get_driver() is driver
+
+        assert [call.args[0] for call in mock_service.call_args_list] == [outdated_path, "/new/chromedriver"]
+        assert mock_driver_manager.return_value.install.call_count == 1
+        with open(self.cache_file) as cache_file:
+            assert cache_file.read() == "/new/chromedriver"
+
+
+@patch("posthog.tasks.exports.image_exporter.websocket.create_connection")
+class TestCDPSession(TestCase):
+    def test_send_skips_events_until_matching_response(self, mock_create_connection) -> None:
+        mock_ws = mock_create_connection.return_value
+        mock_ws.recv.side_effect = [
+            json.dumps({"method": "Page.frameNavigated", "params": {}}),
+            json.dumps({"id": 1, "result": {"data": "aW1hZ2U="}}),
+        ]
+        session = image_exporter._CDPSession("ws://localhost:9222/devtools/page/1")
+
+        assert session.send("Page.captureScreenshot", {"format": "png"}) == {"data": "aW1hZ2U="}
+        assert json.loads(mock_ws.send.call_args.args[0]) == {
+            "id": 1,
+            "method": "Page.captureScreenshot",
+            "params": {"format": "png"},
+        }
+
+    def test_send_raises_on_error_response(self, mock_create_connection) -> None:
+        mock_create_connection.return_value.recv.return_value = json.dumps(
+            {"id": 1, "error": {"code": -32000, "message": "Not attached to an active page"}}
+        )
+        session = image_exporter._CDPSession("ws://localhost:9222/devtools/page/1")
+
+        with self.assertRaises(WebDriverException):
+            session.send("Runtime.evaluate", {"expression": "1"})
+
+
+class TestOptimizePng(TestCase):
+    def test_optimizes_png(self) -> None:
+        output = BytesIO()
+        Image.new("RGB", (200, 200), "red").save(output, format="PNG", compress_level=0)
+        image_data = output.getvalue()
+
+        optimized = image_exporter._optimize_png(image_data)
+
+        assert len(optimized) < len(image_data)
+        assert Image.open(BytesIO(optimized)).size == (200, 200)
+
+    def test_returns_original_when_not_a_png(self) -> None:
+        assert image_exporter._optimize_png(b"image_data") == b"image_data"
+
+
+class TestCaptureScreenshot(TestCase):
+    def _png_of_height(self, height: int) -> str:
+        output = BytesIO()
+        Image.new("RGB", (10, height), "red").save(output, format="PNG")
+        return base64.b64encode(output.getvalue()).decode()
+
+    def test_captures_regular_pages_in_one_go(self) -> None:
+        driver = MagicMock()
+        driver.execute_cdp_cmd.return_value = {"data": self._png_of_height(100)}
+
+        image_data = image_exporter._capture_screenshot(driver, 10, 100, "png")
+
+        assert driver.execute_cdp_cmd.call_count == 1
+        assert Image.open(BytesIO(image_data)).size == (10, 100)
+
+    @patch("posthog.tasks.exports.image_exporter.MAX_SCREENSHOT_HEIGHT_PX", 40)
+    def test_stitches_slices_of_very_tall_pages(self) -> None:
+        driver = MagicMock()
+        driver.execute_cdp_cmd.side_effect = [
+            {"result": {}},
+            {"data": self._png_of_height(40)},
+            {"result": {}},
+            {"data": self._png_of_height(40)},
+            {"result": {}},
+            {"data": self._png_of_height(20)},
+        ]
+
+        image_data = image_exporter._capture_screenshot(driver, 10, 100, "jpeg")
+
+        calls = driver.execute_cdp_cmd.call_args_list
+        scrolls = [call.args[1]["expression"] for call in calls if call.args[0] == "Runtime.evaluate"]
+        assert scrolls == [
+            "window.scrollTo(0, 0)",
+            "window.scrollTo(0, 40)",
+            "window.scrollTo(0, 80)",
+        ]
+        captures = [call.args[1] for call in calls if call.args[0] == "Page.captureScreenshot"]
+        assert all(not capture["captureBeyondViewport"] for capture in captures)
+        assert [(capture["clip"]["y"], capture["clip"]["height"]) for capture in captures] == [
+            (0, 40),
+            (40, 40),
+            (80, 20),
+        ]
+        image = Image.open(BytesIO(image_data))
+        assert image.format == "JPEG"
+        assert image.size == (10, 100)
+
+
+@patch("posthog.tasks.exports.image_exporter.capture_exception")
+@patch("posthog.tasks.exports.image_exporter._capture_screenshot", return_value=b"image_data")
+@patch("posthog.tasks.exports.image_exporter._set_viewport")
+@patch("posthog.tasks.exports.image_exporter._wait_until")
+@patch("posthog.tasks.exports.image_exporter._DRIVER_POOL")
+class TestScreenshotAsset(TestCase):
+    def setUp(self) -> None:
+        self.driver = MagicMock()
+        self.element_rendered = True
+
+        def evaluate(driver, expression):
+            if expression == image_exporter.MEASURE_PAGE_JS:
+                return {"height": 1234.2, "tableWidth": 1000}
+            if expression == image_exporter.SETTLE_LAYOUT_JS:
+                return 1300
+            return self.element_rendered
+
+        evaluate_patcher = patch("posthog.tasks.exports.image_exporter._evaluate", side_effect=evaluate)
+        evaluate_patcher.start()
+        self.addCleanup(evaluate_patcher.stop)
+
+    def test_captures_page_at_its_measured_size(
+        self, mock_pool, mock_wait_until, mock_set_viewport, mock_capture_screenshot, mock_capture_exception
+    ) -> None:
+        mock_pool.acquire.return_value = self.driver
+
+        image_data, render_complete = image_exporter._screenshot_asset(
+            "http://localhost:8010/exporter", 800, ".InsightCard", "png"
+        )
+
+        assert image_data == b"image_data"
+        assert render_complete
+        self.driver.get.assert_called_once_with("http://localhost:8010/exporter")
+        assert [call.args for call in mock_set_viewport.call_args_list] == [
+            (self.driver, 800, image_exporter.INITIAL_VIEWPORT_HEIGHT, 2),
+            (self.driver, 1000, 1235, 2),
+            (self.driver, 1000, 1300, 2),
+        ]
+        mock_capture_screenshot.assert_called_once_with(self.driver, 1000, 1300, "png")
+        mock_capture_exception.assert_not_called()
+        mock_pool.release.assert_called_once_with(self.driver, healthy=True)
+
+    def test_emulates_the_requested_scale_factor(
+        self, mock_pool, mock_wait_until, mock_set_viewport, mock_capture_screenshot, mock_capture_exception
+    ) -> None:
+        mock_pool.acquire.return_value = self.driver
+
+        image_exporter._screenshot_asset("http://localhost:8010/exporter", 1920, ".InsightCard", "jpeg", scale_factor=1)
+
+        assert {call.args[3] for call in mock_set_viewport.call_args_list} == {1}
+        mock_capture_screenshot.assert_called_once_with(self.driver, 1920, 1300, "jpeg")
+
+    def test_raises_when_the_element_never_renders(
+        self, mock_pool, mock_wait_until, mock_set_viewport, mock_capture_screenshot, mock_capture_exception
+    ) -> None:
+        mock_pool.acquire.return_value = self.driver
+        mock_wait_until.side_effect = TimeoutException()
+        self.element_rendered = False
+
+        with self.assertRaises(TimeoutException):
+            image_exporter._screenshot_asset("http://localhost:8010/exporter", 800, ".InsightCard", "png")
+
+        mock_capture_screenshot.assert_not_called()
+        mock_capture_exception.assert_called_once()
+        mock_pool.release.assert_called_once_with(self.driver, healthy=False)
+
+    def test_exports_anyway_when_a_spinner_lingers(
+        self, mock_pool, mock_wait_until, mock_set_viewport, mock_capture_screenshot, mock_capture_exception
+    ) -> None:
+        mock_pool.acquire.return_value = self.driver
+        mock_wait_until.side_effect = TimeoutException()
+
+        with patch.object(image_exporter.logger, "exception") as mock_log_exception:
+            image_data, render_complete = image_exporter._screenshot_asset(
+                "http://localhost:8010/exporter", 800, ".InsightCard", "png"
+            )
+
+        assert image_data == b"image_data"
+        assert not render_complete
+        mock_log_exception.assert_called_once()
+        assert mock_log_exception.call_args.args[0] == "image_exporter.timeout"
+        mock_capture_exception.assert_called_once_with()
+        mock_capture_screenshot.assert_called_once_with(self.driver, 1000, 1300, "png")
+        mock_pool.release.assert_called_once_with(self.driver, healthy=True)